@@ -13,12 +13,21 @@ import sys
 # Fix encodage Windows
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-import shutil
+import re
+import stat
+import fnmatch
 import tempfile
 import argparse
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime, timedelta
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# Attente maximale du vidage de la corbeille (secondes)
+RECYCLE_BIN_TIMEOUT = 60
 
 
 class SystemCleaner:
@@ -33,131 +42,316 @@ class SystemCleaner:
             "bytes_freed": 0,
             "errors": []
         }
+        self._lock = threading.Lock()
+        self._log_buf = []
+        self._local = threading.local()
+
+        # Tables de chemins résolues une seule fois
+        home = os.path.expanduser("~")
+        local_appdata = os.path.join(home, "AppData", "Local")
+        windir = os.environ.get("WINDIR")
+
+        self._temp_paths = [
+            path for path in (
+                tempfile.gettempdir(),
+                os.environ.get("TEMP"),
+                os.environ.get("TMP"),
+                os.path.join(local_appdata, "Temp"),
+            ) if path
+        ]
+        self._windows_cache_paths = [
+            os.path.join(local_appdata, "Microsoft", "Windows", "INetCache"),
+        ]
+        if windir:
+            self._windows_cache_paths += [
+                os.path.join(windir, "Prefetch"),
+                os.path.join(windir, "SoftwareDistribution", "Download"),
+            ]
+        self._windows_cache_patterns = [
+            self._compile_pattern(
+                os.path.join(local_appdata, "Microsoft", "Windows", "Explorer"), "thumbcache_*.db"
+            ),
+        ]
+        self._browser_paths = {
+            "Chrome": os.path.join(local_appdata, "Google", "Chrome", "User Data", "Default", "Cache"),
+            "Firefox": self._compile_pattern(
+                os.path.join(local_appdata, "Mozilla", "Firefox", "Profiles"), "*", "cache2"
+            ),
+            "Edge": os.path.join(local_appdata, "Microsoft", "Edge", "User Data", "Default", "Cache"),
+            "Brave": os.path.join(local_appdata, "BraveSoftware", "Brave-Browser", "User Data", "Default", "Cache"),
+        }
+        self._log_patterns = [
+            self._compile_pattern(os.path.join(local_appdata, "Temp"), "*.log"),
+        ]
+
+    @staticmethod
+    def _compile_pattern(parent, name_pattern, tail=""):
+        """Précompile un motif glob portant sur un seul composant du chemin."""
+        flags = re.IGNORECASE if sys.platform == 'win32' else 0
+        # Suffixe déjà préfixé du séparateur : simple concaténation dans la boucle
+        tail = os.sep + tail if tail else ""
+        return parent, re.compile(fnmatch.translate(name_pattern), flags), tail
+
+    @staticmethod
+    def _expand_pattern(pattern):
+        """Résout un motif précompilé en une seule lecture du dossier parent.
+
+        Retourne une liste de (chemin, DirEntry du composant correspondant).
+        """
+        parent, regex, tail = pattern
+        matches = []
+        try:
+            with os.scandir(parent) as it:
+                for entry in it:
+                    if not regex.match(entry.name):
+                        continue
+                    if tail:
+                        path = entry.path + tail
+                        if not os.path.exists(path):
+                            continue
+                    else:
+                        path = entry.path
+                    matches.append((path, entry))
+        except OSError:
+            pass
+        return matches
 
     def log(self, message, level="info"):
         """Log avec niveau."""
         if self.verbose or level in ["error", "warning"]:
             prefix = {"info": "ℹ️", "success": "✅", "warning": "⚠️", "error": "❌"}.get(level, "")
-            print(f"{prefix} {message}")
-
-    def get_size(self, path):
-        """Taille d'un fichier ou dossier."""
-        if os.path.isfile(path):
-            return os.path.getsize(path)
-        total = 0
+            # Les workers écrivent dans leur tampon local, fusionné à la fin du job
+            buffer = getattr(self._local, "buf", None)
+            if buffer is not None:
+                buffer.append(f"{prefix} {message}")
+            else:
+                with self._lock:
+                    self._log_buf.append(f"{prefix} {message}")
+
+    def _flush_log(self):
+        """Écrit les messages en attente en une seule écriture sur stdout."""
+        with self._lock:
+            lines, self._log_buf = self._log_buf, []
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    @staticmethod
+    def _is_reparse_point(st):
+        """Jonction ou lien symbolique Windows : ne jamais le parcourir."""
+        return bool(getattr(st, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+    def _fast_rmtree(self, root, count_only=False):
+        """Supprime une arborescence via os.scandir.
+
+        Retourne (fichiers supprimés, dossiers supprimés, octets libérés),
+        comptés pendant la suppression elle-même. Avec count_only, rien
+        n'est supprimé et les compteurs décrivent ce qui le serait.
+        Une entrée verrouillée n'interrompt pas le reste de l'arborescence.
+        """
+        files_deleted = dirs_deleted = bytes_freed = 0
         try:
-            for dirpath, _, filenames in os.walk(path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    if os.path.exists(fp):
-                        total += os.path.getsize(fp)
-        except (PermissionError, OSError):
-            pass
-        return total
+            st = os.lstat(root)
+            if not stat.S_ISDIR(st.st_mode) or self._is_reparse_point(st):
+                return 0, 0, 0
+            stack = [(root, os.scandir(root), [])]
+        except OSError:
+            return 0, 0, 0
+
+        while stack:
+            path, it, pending = stack[-1]
+            try:
+                entry = next(it, None)
+            except OSError:
+                entry = None
+            if entry is None:
+                it.close()
+                stack.pop()
+                if count_only:
+                    files_deleted += len(pending)
+                    bytes_freed += sum(size for _, size in pending)
+                    dirs_deleted += 1
+                    continue
+                # Les fichiers du dossier sont supprimés avant le rmdir
+                for file_path, size in pending:
+                    try:
+                        os.unlink(file_path)
+                    except OSError:
+                        continue
+                    files_deleted += 1
+                    bytes_freed += size
+                try:
+                    os.rmdir(path)
+                    dirs_deleted += 1
+                except OSError:
+                    pass
+                continue
+
+            try:
+                st = entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False) and not self._is_reparse_point(st):
+                    stack.append((entry.path, os.scandir(entry.path), []))
+                else:
+                    pending.append((entry.path, st.st_size))
+            except OSError:
+                pass
+
+        return files_deleted, dirs_deleted, bytes_freed
+
+    @staticmethod
+    def _new_stats():
+        """Compteurs locaux d'un worker, fusionnés ensuite dans self.stats."""
+        return {
+            "files_deleted": 0,
+            "dirs_deleted": 0,
+            "bytes_freed": 0,
+            "errors": []
+        }
 
-    def delete_path(self, path, description=""):
+    def _merge_stats(self, stats, log_lines=()):
+        """Fusionne les compteurs et les logs d'un worker dans self.stats."""
+        with self._lock:
+            self.stats["files_deleted"] += stats["files_deleted"]
+            self.stats["dirs_deleted"] += stats["dirs_deleted"]
+            self.stats["bytes_freed"] += stats["bytes_freed"]
+            self.stats["errors"].extend(stats["errors"])
+            self._log_buf.extend(log_lines)
+
+    def delete_path(self, path, description="", stats=None):
         """Supprime un fichier ou dossier."""
-        if not os.path.exists(path):
+        if stats is None:
+            stats = self.stats
+        # Un seul stat pour l'existence, le type et la taille
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
             return 0
 
-        size = self.get_size(path)
+        is_file = not stat.S_ISDIR(st.st_mode)
 
         if self.dry_run:
-            self.log(f"[DRY-RUN] Supprimerais: {path} ({self.format_size(size)})")
+            if is_file:
+                size = st.st_size
+            else:
+                _, _, size = self._fast_rmtree(path, count_only=True)
+            if self.verbose:
+                self.log(f"[DRY-RUN] Supprimerais: {path} ({self.format_size(size)})")
             return size
 
         try:
-            if os.path.isfile(path):
+            if is_file:
+                size = st.st_size
                 os.remove(path)
-                self.stats["files_deleted"] += 1
+                stats["files_deleted"] += 1
             else:
-                shutil.rmtree(path, ignore_errors=True)
-                self.stats["dirs_deleted"] += 1
-
-            self.stats["bytes_freed"] += size
-            self.log(f"Supprimé: {path} ({self.format_size(size)})", "success")
+                # La taille est cumulée pendant la suppression, sans pré-parcours
+                files, dirs, size = self._fast_rmtree(path)
+                stats["files_deleted"] += files
+                stats["dirs_deleted"] += dirs
+
+            stats["bytes_freed"] += size
+            if self.verbose:
+                self.log(f"Supprimé: {path} ({self.format_size(size)})", "success")
             return size
+        except FileNotFoundError:
+            # Déjà supprimé entre-temps : rien à libérer, pas une erreur
+            return 0
         except (PermissionError, OSError) as e:
-            self.stats["errors"].append(str(e))
+            stats["errors"].append(str(e))
             self.log(f"Erreur: {path} - {e}", "error")
             return 0
 
-    def format_size(self, bytes_size):
-        """Formate la taille en unités lisibles."""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if bytes_size < 1024:
-                return f"{bytes_size:.2f} {unit}"
-            bytes_size /= 1024
-        return f"{bytes_size:.2f} TB"
-
-    def clean_temp_folders(self):
-        """Nettoie les dossiers temporaires."""
-        self.log("Nettoyage des dossiers temporaires...", "info")
-
-        temp_paths = [
-            tempfile.gettempdir(),
-            os.path.expandvars(r"%TEMP%"),
-            os.path.expandvars(r"%TMP%"),
-            os.path.expanduser("~\\AppData\\Local\\Temp"),
-        ]
+    def _delete_root(self, path, description=""):
+        """Worker : supprime une racine et retourne ses compteurs."""
+        stats = self._new_stats()
+        self.delete_path(path, description, stats)
+        return stats
 
-        for temp_path in set(temp_paths):
-            if os.path.exists(temp_path):
-                try:
-                    for item in os.listdir(temp_path):
-                        item_path = os.path.join(temp_path, item)
-                        # Ne pas supprimer les fichiers récents (< 1h)
-                        try:
-                            mtime = os.path.getmtime(item_path)
-                            if datetime.now() - datetime.fromtimestamp(mtime) < timedelta(hours=1):
-                                continue
-                        except OSError:
-                            continue
-                        self.delete_path(item_path, "temp")
-                except PermissionError:
-                    pass
-
-    def clean_windows_cache(self):
-        """Nettoie les caches Windows."""
-        self.log("Nettoyage des caches Windows...", "info")
-
-        cache_paths = [
-            os.path.expanduser("~\\AppData\\Local\\Microsoft\\Windows\\INetCache"),
-            os.path.expanduser("~\\AppData\\Local\\Microsoft\\Windows\\Explorer\\thumbcache_*.db"),
-            os.path.expandvars(r"%WINDIR%\Prefetch"),
-            os.path.expandvars(r"%WINDIR%\SoftwareDistribution\Download"),
-        ]
-
-        for cache_path in cache_paths:
-            if "*" in cache_path:
-                # Glob pattern
-                from glob import glob
-                for matched in glob(cache_path):
-                    self.delete_path(matched, "cache")
-            elif os.path.exists(cache_path):
-                self.delete_path(cache_path, "cache")
-
-    def clean_browser_cache(self):
-        """Nettoie les caches des navigateurs."""
-        self.log("Nettoyage des caches navigateurs...", "info")
-
-        browsers = {
-            "Chrome": "~\\AppData\\Local\\Google\\Chrome\\User Data\\Default\\Cache",
-            "Firefox": "~\\AppData\\Local\\Mozilla\\Firefox\\Profiles\\*\\cache2",
-            "Edge": "~\\AppData\\Local\\Microsoft\\Edge\\User Data\\Default\\Cache",
-            "Brave": "~\\AppData\\Local\\BraveSoftware\\Brave-Browser\\User Data\\Default\\Cache",
-        }
+    def _sweep_temp_dir(self, temp_path, description="temp"):
+        """Worker : vide un dossier temporaire et retourne ses compteurs."""
+        stats = self._new_stats()
+        try:
+            with os.scandir(temp_path) as it:
+                entries = list(it)
+        except OSError:
+            return stats
+        # Ne pas supprimer les fichiers récents (< 1h)
+        cutoff = time.time() - 3600.0
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            self.delete_path(entry.path, description, stats)
+        return stats
+
+    def _run_job(self, worker, path, description):
+        """Exécute un worker avec un tampon de logs propre à son thread."""
+        self._local.buf = []
+        try:
+            stats = worker(path, description)
+        finally:
+            log_lines, self._local.buf = self._local.buf, None
+        return stats, log_lines
 
-        for browser, path in browsers.items():
-            expanded = os.path.expanduser(path)
-            if "*" in expanded:
-                from glob import glob
-                for matched in glob(expanded):
+    def format_size(self, bytes_size):
+        """Formate la taille en unités lisibles."""
+        bytes_size = int(bytes_size)
+        # Unité choisie directement par puissance de 1024, sans boucle
+        idx = min(max(0, (bytes_size.bit_length() - 1) // 10), len(SIZE_UNITS) - 1)
+        return f"{bytes_size / (1 << (idx * 10)):.2f} {SIZE_UNITS[idx]}"
+
+    @staticmethod
+    def _path_key(path):
+        """Identité de la cible réelle d'un chemin (OSError s'il n'existe pas)."""
+        if sys.platform == 'win32':
+            os.stat(path)
+            return os.path.normcase(os.path.realpath(path))
+        st = os.stat(path)
+        return st.st_dev, st.st_ino
+
+    def _unique_paths(self, paths):
+        """Chemins existants, dédoublonnés sur leur cible réelle.
+
+        %TEMP%, %TMP% et tempfile.gettempdir() pointent en général vers le
+        même dossier : on ne le parcourt qu'une fois. Retourne {clé: chemin}.
+        """
+        unique = {}
+        for path in paths:
+            try:
+                key = self._path_key(path)
+            except OSError:
+                continue
+            unique.setdefault(key, path)
+        return unique
+
+    def _temp_jobs(self, roots):
+        """Racines des dossiers temporaires (roots : {clé: chemin} de _unique_paths)."""
+        return [(self._sweep_temp_dir, temp_path, "temp") for temp_path in roots.values()]
+
+    def _windows_cache_jobs(self):
+        """Racines des caches Windows."""
+        jobs = []
+        for pattern in self._windows_cache_patterns:
+            for matched, _ in self._expand_pattern(pattern):
+                jobs.append((self._delete_root, matched, "cache"))
+        for cache_path in self._unique_paths(self._windows_cache_paths).values():
+            jobs.append((self._delete_root, cache_path, "cache"))
+        return jobs
+
+    def _browser_cache_jobs(self):
+        """Racines des caches navigateurs."""
+        jobs = []
+        for browser, target in self._browser_paths.items():
+            if isinstance(target, tuple):
+                for matched, _ in self._expand_pattern(target):
                     self.log(f"Nettoyage cache {browser}...", "info")
-                    self.delete_path(matched, f"cache_{browser.lower()}")
-            elif os.path.exists(expanded):
+                    jobs.append((self._delete_root, matched, f"cache_{browser.lower()}"))
+            elif os.path.exists(target):
                 self.log(f"Nettoyage cache {browser}...", "info")
-                self.delete_path(expanded, f"cache_{browser.lower()}")
+                jobs.append((self._delete_root, target, f"cache_{browser.lower()}"))
+        return jobs
 
     def clean_recycle_bin(self):
         """Vide la corbeille (Windows)."""
@@ -180,28 +374,20 @@ class SystemCleaner:
         except Exception as e:
             self.log(f"Impossible de vider la corbeille: {e}", "warning")
 
-    def clean_logs(self):
-        """Nettoie les anciens fichiers log."""
-        self.log("Nettoyage des anciens logs...", "info")
-
-        log_paths = [
-            os.path.expandvars(r"%WINDIR%\Logs"),
-            os.path.expanduser("~\\AppData\\Local\\Temp\\*.log"),
-        ]
-
+    def _log_jobs(self):
+        """Anciens fichiers log à supprimer."""
         # Supprimer les logs > 7 jours
-        cutoff = datetime.now() - timedelta(days=7)
+        cutoff = time.time() - 7 * 86400
 
-        for log_path in log_paths:
-            if "*" in log_path:
-                from glob import glob
-                for matched in glob(log_path):
-                    try:
-                        mtime = datetime.fromtimestamp(os.path.getmtime(matched))
-                        if mtime < cutoff:
-                            self.delete_path(matched, "log")
-                    except OSError:
-                        pass
+        jobs = []
+        for pattern in self._log_patterns:
+            for matched, entry in self._expand_pattern(pattern):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        jobs.append((self._delete_root, matched, "log"))
+                except OSError:
+                    pass
+        return jobs
 
     def run(self):
         """Exécute le nettoyage complet."""
@@ -212,11 +398,46 @@ class SystemCleaner:
         if self.dry_run:
             print("⚠️  Mode simulation (dry-run) - rien ne sera supprimé\n")
 
-        self.clean_temp_folders()
-        self.clean_windows_cache()
-        self.clean_browser_cache()
-        self.clean_recycle_bin()
-        self.clean_logs()
+        # La corbeille se vide en arrière-plan pendant les autres nettoyages
+        recycle_bin = threading.Thread(target=self.clean_recycle_bin, daemon=True)
+        recycle_bin.start()
+
+        # Les racines sont indépendantes : on les nettoie en parallèle
+        self.log("Nettoyage des dossiers temporaires, caches et logs...", "info")
+        temp_roots = self._unique_paths(self._temp_paths)
+        temp_jobs = self._temp_jobs(temp_roots)
+        # Les logs situés directement dans un dossier temporaire balayé sont déjà
+        # couverts par ce balayage : deux workers ne doivent pas viser le même fichier
+        swept = temp_roots.keys()
+        log_jobs = []
+        for job in self._log_jobs():
+            try:
+                if self._path_key(os.path.dirname(job[1])) in swept:
+                    continue
+            except OSError:
+                continue
+            log_jobs.append(job)
+        jobs = (
+            temp_jobs
+            + self._windows_cache_jobs()
+            + self._browser_cache_jobs()
+            + log_jobs
+        )
+        self._flush_log()
+        max_workers = min(32, 2 * (os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._run_job, worker, path, description)
+                for worker, path, description in jobs
+            ]
+            for future in as_completed(futures):
+                self._merge_stats(*future.result())
+        self._flush_log()
+
+        recycle_bin.join(timeout=RECYCLE_BIN_TIMEOUT)
+        if recycle_bin.is_alive():
+            self.log("Vidage de la corbeille toujours en cours, abandon de l'attente", "warning")
+        self._flush_log()
 
         print("\n" + "=" * 50)
         print("📊 RÉSULTAT DU NETTOYAGE")
@@ -230,15 +451,15 @@ class SystemCleaner:
 
         print("=" * 50)
 
-        # Retourner le résultat en JSON pour l'agent
-        return json.dumps({
+        # Résultat sérialisé en JSON pour l'agent
+        return {
             "success": True,
             "files_deleted": self.stats["files_deleted"],
             "dirs_deleted": self.stats["dirs_deleted"],
             "bytes_freed": self.stats["bytes_freed"],
             "bytes_freed_formatted": self.format_size(self.stats["bytes_freed"]),
             "errors_count": len(self.stats["errors"])
-        })
+        }
 
 
 def main():
@@ -249,7 +470,8 @@ def main():
 
     cleaner = SystemCleaner(dry_run=args.dry_run, verbose=args.verbose)
     result = cleaner.run()
-    print(result)
+    json.dump(result, sys.stdout, ensure_ascii=False, separators=(",", ":"))
+    sys.stdout.write("\n")
     return 0
 
 
@@ -12,13 +12,30 @@ import sys
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
+import asyncio
 import subprocess
 import sys
 import json
-import time
 import socket
 import argparse
-from typing import Dict, Any
+import struct
+import shlex
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Union
+
+# psutil si disponible pour lire les adresses des interfaces
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+# Délai commun accordé aux sondes du diagnostic (secondes)
+PROBE_DEADLINE = 2.0
+
+# Pas de console transitoire pour les commandes lancées (Windows uniquement)
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
 
 
 class NetworkFixer:
@@ -27,24 +44,37 @@ class NetworkFixer:
     def __init__(self, verbose=False):
         self.verbose = verbose
         self.results = []
+        self._log_buf = []
+        self._wlan = None
 
     def log(self, message: str, level: str = "info"):
         """Log avec niveau."""
         if self.verbose or level in ["error", "success"]:
             prefix = {"info": "ℹ️", "success": "✅", "warning": "⚠️", "error": "❌", "run": "🔄"}.get(level, "")
-            print(f"{prefix} {message}")
-        self.results.append({"level": level, "message": message})
-
-    def run_command(self, command: str, description: str) -> bool:
+            self._log_buf.append(f"{prefix} {message}")
+        # Tuple compact : les dicts ne sont construits qu'à la sortie JSON finale
+        self.results.append((level, message))
+
+    def _flush_log(self):
+        """Écrit les messages en attente en une seule écriture sur stdout."""
+        lines, self._log_buf = self._log_buf, []
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    def run_command(self, command: Union[str, List[str]], description: str) -> bool:
         """Exécute une commande système."""
         self.log(f"{description}...", "run")
         try:
+            if isinstance(command, str):
+                command = shlex.split(command, posix=False)
             result = subprocess.run(
                 command,
-                shell=True,
+                shell=False,
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=30,
+                creationflags=CREATE_NO_WINDOW
             )
             if result.returncode == 0:
                 self.log(f"{description} - OK", "success")
@@ -59,28 +89,173 @@ class NetworkFixer:
             self.log(f"{description} - Exception: {e}", "error")
             return False
 
-    def flush_dns(self) -> bool:
+    async def run_command_async(self, command: Union[str, List[str]], description: str) -> bool:
+        """Exécute une commande système sans bloquer la boucle asyncio."""
+        self.log(f"{description}...", "run")
+        try:
+            if isinstance(command, str):
+                command = shlex.split(command, posix=False)
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                creationflags=CREATE_NO_WINDOW
+            )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=30)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                self.log(f"{description} - Timeout", "error")
+                return False
+            if process.returncode == 0:
+                self.log(f"{description} - OK", "success")
+                return True
+            else:
+                self.log(f"{description} - Erreur: {stderr.decode(errors='replace').strip()}", "error")
+                return False
+        except Exception as e:
+            self.log(f"{description} - Exception: {e}", "error")
+            return False
+
+    def _has_default_gateway(self) -> bool:
+        """Demande à l'IP Helper la meilleure route vers Internet."""
+        import ctypes
+        from ctypes import wintypes
+
+        class MIB_IPFORWARDROW(ctypes.Structure):
+            _fields_ = [
+                ("dwForwardDest", wintypes.DWORD),
+                ("dwForwardMask", wintypes.DWORD),
+                ("dwForwardPolicy", wintypes.DWORD),
+                ("dwForwardNextHop", wintypes.DWORD),
+                ("dwForwardIfIndex", wintypes.DWORD),
+                ("dwForwardType", wintypes.DWORD),
+                ("dwForwardProto", wintypes.DWORD),
+                ("dwForwardAge", wintypes.DWORD),
+                ("dwForwardNextHopAS", wintypes.DWORD),
+                ("dwForwardMetric1", wintypes.DWORD),
+                ("dwForwardMetric2", wintypes.DWORD),
+                ("dwForwardMetric3", wintypes.DWORD),
+                ("dwForwardMetric4", wintypes.DWORD),
+                ("dwForwardMetric5", wintypes.DWORD),
+            ]
+
+        # Adresse en ordre réseau, comme l'attend GetBestRoute
+        destination = struct.unpack("<I", socket.inet_aton("8.8.8.8"))[0]
+        iphlpapi = ctypes.windll.iphlpapi
+        iphlpapi.GetBestRoute.argtypes = [wintypes.DWORD, wintypes.DWORD, ctypes.POINTER(MIB_IPFORWARDROW)]
+        row = MIB_IPFORWARDROW()
+        if iphlpapi.GetBestRoute(destination, 0, ctypes.byref(row)) != 0:
+            return False
+        return row.dwForwardDest == 0
+
+    def _wlan_interfaces(self) -> List[Dict[str, Any]]:
+        """Adaptateurs WiFi via la Native Wifi API (wlanapi.dll).
+
+        Le nom renvoyé est l'alias réel de l'interface (« Wi-Fi », « Wi-Fi 2 »...),
+        utilisable tel quel avec netsh. Le résultat est mis en cache.
+        """
+        if self._wlan is not None:
+            return self._wlan
+
+        import ctypes
+        from ctypes import wintypes
+
+        class GUID(ctypes.Structure):
+            _fields_ = [
+                ("Data1", wintypes.DWORD),
+                ("Data2", wintypes.WORD),
+                ("Data3", wintypes.WORD),
+                ("Data4", ctypes.c_ubyte * 8),
+            ]
+
+        class WLAN_INTERFACE_INFO(ctypes.Structure):
+            _fields_ = [
+                ("InterfaceGuid", GUID),
+                ("strInterfaceDescription", wintypes.WCHAR * 256),
+                ("isState", wintypes.DWORD),
+            ]
+
+        class WLAN_INTERFACE_INFO_LIST(ctypes.Structure):
+            _fields_ = [
+                ("dwNumberOfItems", wintypes.DWORD),
+                ("dwIndex", wintypes.DWORD),
+                ("InterfaceInfo", WLAN_INTERFACE_INFO * 1),
+            ]
+
+        class NET_LUID(ctypes.Structure):
+            _fields_ = [("Value", ctypes.c_uint64)]
+
+        iphlpapi = ctypes.windll.iphlpapi
+        iphlpapi.ConvertInterfaceGuidToLuid.argtypes = [ctypes.POINTER(GUID), ctypes.POINTER(NET_LUID)]
+        iphlpapi.ConvertInterfaceLuidToAlias.argtypes = [
+            ctypes.POINTER(NET_LUID), ctypes.c_wchar_p, ctypes.c_size_t
+        ]
+
+        def interface_alias(guid) -> Optional[str]:
+            luid = NET_LUID()
+            if iphlpapi.ConvertInterfaceGuidToLuid(ctypes.byref(guid), ctypes.byref(luid)):
+                return None
+            alias = ctypes.create_unicode_buffer(257)  # NDIS_IF_MAX_STRING_SIZE + 1
+            if iphlpapi.ConvertInterfaceLuidToAlias(ctypes.byref(luid), alias, len(alias)):
+                return None
+            return alias.value
+
+        wlanapi = ctypes.windll.wlanapi
+        handle = wintypes.HANDLE()
+        negotiated = wintypes.DWORD()
+        error = wlanapi.WlanOpenHandle(2, None, ctypes.byref(negotiated), ctypes.byref(handle))
+        if error:
+            raise ctypes.WinError(error)
+        try:
+            info_list = ctypes.POINTER(WLAN_INTERFACE_INFO_LIST)()
+            error = wlanapi.WlanEnumInterfaces(handle, None, ctypes.byref(info_list))
+            if error:
+                raise ctypes.WinError(error)
+            try:
+                count = info_list.contents.dwNumberOfItems
+                infos = ctypes.cast(
+                    ctypes.byref(info_list.contents.InterfaceInfo),
+                    ctypes.POINTER(WLAN_INTERFACE_INFO * count)
+                ).contents
+                # Tout est copié avant WlanFreeMemory
+                self._wlan = [
+                    {
+                        "name": interface_alias(info.InterfaceGuid),
+                        "description": info.strInterfaceDescription,
+                        "state": info.isState
+                    }
+                    for info in infos
+                ]
+                return self._wlan
+            finally:
+                wlanapi.WlanFreeMemory(info_list)
+        finally:
+            wlanapi.WlanCloseHandle(handle, None)
+
+    async def flush_dns(self) -> bool:
         """Vide le cache DNS."""
         self.log("=== FLUSH DNS ===", "info")
-        return self.run_command(
+        return await self.run_command_async(
             "ipconfig /flushdns",
             "Vidage du cache DNS"
         )
 
-    def renew_dhcp(self) -> bool:
+    async def renew_dhcp(self) -> bool:
         """Renouvelle le bail DHCP."""
         self.log("=== RENOUVELLEMENT DHCP ===", "info")
 
         # Release
-        release = self.run_command(
+        release = await self.run_command_async(
             "ipconfig /release",
             "Libération du bail DHCP"
         )
 
-        time.sleep(2)
+        await asyncio.sleep(2)
 
         # Renew
-        renew = self.run_command(
+        renew = await self.run_command_async(
             "ipconfig /renew",
             "Renouvellement du bail DHCP"
         )
@@ -109,59 +284,130 @@ class NetworkFixer:
         ))
         return all(results)
 
-    def reset_wifi_adapter(self) -> bool:
+    async def reset_wifi_adapter(self) -> bool:
         """Réinitialise l'adaptateur WiFi."""
         self.log("=== RESET ADAPTATEUR WIFI ===", "info")
 
-        # Trouver l'adaptateur WiFi
+        # Trouver les adaptateurs WiFi et leur vrai nom
+        names = ["Wi-Fi"]
         try:
-            result = subprocess.run(
-                'netsh wlan show interfaces',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            if "Wi-Fi" not in result.stdout and "Wireless" not in result.stdout:
+            interfaces = self._wlan_interfaces()
+            if not interfaces:
                 self.log("Aucun adaptateur WiFi trouvé", "warning")
                 return False
+            names = [i["name"] for i in interfaces if i["name"]] or names
         except Exception:
             pass
 
         # Désactiver puis réactiver
-        disable = self.run_command(
-            'netsh interface set interface "Wi-Fi" disable',
-            "Désactivation de l'adaptateur WiFi"
-        )
+        results = []
+        for name in names:
+            results.append(await self.run_command_async(
+                ["netsh", "interface", "set", "interface", f"name={name}", "admin=disabled"],
+                f"Désactivation de l'adaptateur WiFi ({name})"
+            ))
 
-        time.sleep(3)
+        await asyncio.sleep(3)
 
-        enable = self.run_command(
-            'netsh interface set interface "Wi-Fi" enable',
-            "Réactivation de l'adaptateur WiFi"
-        )
+        for name in names:
+            results.append(await self.run_command_async(
+                ["netsh", "interface", "set", "interface", f"name={name}", "admin=enabled"],
+                f"Réactivation de l'adaptateur WiFi ({name})"
+            ))
+
+        return all(results)
 
-        return disable and enable
+    def _try_set_dns(self, interface: str) -> bool:
+        """DNS primaire Google sur une interface, puis secondaire si accepté."""
+        if not self.run_command(
+            ["netsh", "interface", "ip", "set", "dns", interface, "static", "8.8.8.8", "primary"],
+            f"Configuration DNS primaire sur {interface}"
+        ):
+            return False
+        self.run_command(
+            ["netsh", "interface", "ip", "add", "dns", interface, "8.8.4.4", "index=2"],
+            f"Configuration DNS secondaire sur {interface}"
+        )
+        return True
 
     def set_google_dns(self) -> bool:
         """Configure les DNS Google."""
         self.log("=== CONFIGURATION DNS GOOGLE ===", "info")
 
-        # Trouver l'interface active
+        # Interfaces candidates, essayées en parallèle
         interfaces = ["Wi-Fi", "Ethernet", "Connexion au réseau local"]
 
-        for interface in interfaces:
-            result1 = self.run_command(
-                f'netsh interface ip set dns "{interface}" static 8.8.8.8 primary',
-                f"Configuration DNS primaire sur {interface}"
-            )
-            if result1:
-                self.run_command(
-                    f'netsh interface ip add dns "{interface}" 8.8.4.4 index=2',
-                    f"Configuration DNS secondaire sur {interface}"
-                )
-                return True
+        with ThreadPoolExecutor(max_workers=len(interfaces)) as executor:
+            results = list(executor.map(self._try_set_dns, interfaces))
 
-        return False
+        return any(results)
+
+    @staticmethod
+    def _probe_internet() -> bool:
+        """Connexion TCP vers un DNS public."""
+        try:
+            socket.create_connection(("8.8.8.8", 53), timeout=PROBE_DEADLINE).close()
+            return True
+        except (socket.timeout, OSError):
+            return False
+
+    @staticmethod
+    def _probe_dns() -> bool:
+        """Résolution d'un nom public."""
+        try:
+            socket.gethostbyname("google.com")
+            return True
+        except socket.gaierror:
+            return False
+
+    @staticmethod
+    def _probe_local_ip() -> Optional[str]:
+        """IP locale lue sur les interfaces, sans trafic réseau."""
+        try:
+            for *_, sockaddr in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+                if not sockaddr[0].startswith("127."):
+                    return sockaddr[0]
+        except OSError:
+            pass
+
+        if HAS_PSUTIL:
+            for addrs in psutil.net_if_addrs().values():
+                for addr in addrs:
+                    if addr.family == socket.AF_INET and not addr.address.startswith("127."):
+                        return addr.address
+
+        # Dernier recours : un connect UDP n'envoie aucun paquet
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                return s.getsockname()[0]
+        except OSError:
+            return None
+
+    @staticmethod
+    def _start_probe(probe) -> Future:
+        """Lance une sonde sur un thread démon.
+
+        Contrairement aux workers d'un ThreadPoolExecutor, une sonde encore
+        bloquée à l'échéance ne retarde pas la sortie de l'interpréteur.
+        """
+        future = Future()
+
+        def target():
+            try:
+                future.set_result(probe())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, daemon=True).start()
+        return future
+
+    @staticmethod
+    def _probe_result(future, default):
+        """Résultat d'une sonde, ou la valeur par défaut si elle a dépassé le délai."""
+        if not future.done() or future.exception() is not None:
+            return default
+        return future.result()
 
     def diagnose(self) -> Dict[str, Any]:
         """Diagnostic réseau complet."""
@@ -175,84 +421,96 @@ class NetworkFixer:
             "issues": []
         }
 
-        # Test connexion internet
+        # Les sondes sont indépendantes : on les lance en parallèle
         self.log("Test connexion internet...", "run")
-        try:
-            socket.create_connection(("8.8.8.8", 53), timeout=3)
+        self.log("Test résolution DNS...", "run")
+        internet = self._start_probe(self._probe_internet)
+        dns = self._start_probe(self._probe_dns)
+        local_ip = self._start_probe(self._probe_local_ip)
+        wait([internet, dns, local_ip], timeout=PROBE_DEADLINE)
+
+        # Test connexion internet
+        if self._probe_result(internet, False):
             diagnosis["internet"] = True
             self.log("Connexion internet: OK", "success")
-        except (socket.timeout, OSError):
+        else:
             diagnosis["issues"].append("Pas de connexion internet")
             self.log("Connexion internet: ÉCHEC", "error")
 
         # Test DNS
-        self.log("Test résolution DNS...", "run")
-        try:
-            socket.gethostbyname("google.com")
+        if self._probe_result(dns, False):
             diagnosis["dns"] = True
             self.log("Résolution DNS: OK", "success")
-        except socket.gaierror:
+        else:
             diagnosis["issues"].append("Résolution DNS échouée")
             self.log("Résolution DNS: ÉCHEC", "error")
 
         # Récupérer l'IP locale
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            diagnosis["local_ip"] = s.getsockname()[0]
-            s.close()
+        diagnosis["local_ip"] = self._probe_result(local_ip, None)
+        if diagnosis["local_ip"]:
             self.log(f"IP locale: {diagnosis['local_ip']}", "success")
-        except Exception:
+        else:
             diagnosis["issues"].append("Impossible de déterminer l'IP locale")
 
         # Test passerelle
         self.log("Test passerelle...", "run")
         try:
-            result = subprocess.run(
-                'route print 0.0.0.0',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            if "0.0.0.0" in result.stdout:
-                diagnosis["gateway"] = True
-                self.log("Passerelle: OK", "success")
-            else:
-                diagnosis["issues"].append("Pas de passerelle par défaut")
-                self.log("Passerelle: NON CONFIGURÉE", "error")
+            has_gateway = self._has_default_gateway()
         except Exception:
-            pass
+            has_gateway = False
+        if has_gateway:
+            diagnosis["gateway"] = True
+            self.log("Passerelle: OK", "success")
+        else:
+            diagnosis["issues"].append("Pas de passerelle par défaut")
+            self.log("Passerelle: NON CONFIGURÉE", "error")
 
         return diagnosis
 
-    def full_repair(self) -> bool:
+    async def _reset_wifi_and_wait(self) -> bool:
+        """Reset WiFi puis attente de la reconnexion."""
+        result = await self.reset_wifi_adapter()
+        await asyncio.sleep(5)
+        return result
+
+    async def full_repair(self) -> bool:
         """Réparation complète du réseau."""
         self.log("🔧 RÉPARATION RÉSEAU COMPLÈTE", "info")
+        self._flush_log()
         print("=" * 50)
 
+        # Énumération WiFi partagée le temps de la réparation
+        try:
+            return await self._full_repair()
+        finally:
+            self._wlan = None
+
+    async def _full_repair(self) -> bool:
+        """Étapes de la réparation complète."""
         results = []
 
         # 1. Diagnostic initial
-        diag = self.diagnose()
+        diag = await asyncio.to_thread(self.diagnose)
+        self._flush_log()
 
         if diag["internet"] and diag["dns"]:
             self.log("Le réseau semble fonctionner correctement", "success")
             return True
 
-        # 2. Flush DNS
-        results.append(self.flush_dns())
-
-        # 3. Reset WiFi si problème
+        # 2. Flush DNS et 3. Reset WiFi si problème : sous-systèmes indépendants
+        steps = [self.flush_dns()]
         if not diag["internet"]:
-            results.append(self.reset_wifi_adapter())
-            time.sleep(5)
+            steps.append(self._reset_wifi_and_wait())
+        results.extend(await asyncio.gather(*steps))
+        self._flush_log()
 
         # 4. Renouveler DHCP
-        results.append(self.renew_dhcp())
-        time.sleep(3)
+        results.append(await self.renew_dhcp())
+        self._flush_log()
+        await asyncio.sleep(3)
 
         # 5. Vérifier à nouveau
-        diag_after = self.diagnose()
+        diag_after = await asyncio.to_thread(self.diagnose)
 
         if diag_after["internet"]:
             self.log("✅ Réseau réparé avec succès !", "success")
@@ -277,27 +535,30 @@ def main():
     print("=" * 50)
 
     if args.action == "wifi":
-        success = fixer.reset_wifi_adapter()
+        success = asyncio.run(fixer.reset_wifi_adapter())
     elif args.action == "dns":
-        success = fixer.flush_dns()
+        success = asyncio.run(fixer.flush_dns())
     elif args.action == "dhcp":
-        success = fixer.renew_dhcp()
+        success = asyncio.run(fixer.renew_dhcp())
     elif args.action == "full":
-        success = fixer.full_repair()
+        success = asyncio.run(fixer.full_repair())
     else:  # diagnose
         diag = fixer.diagnose()
+        fixer._flush_log()
         print("\n📊 RÉSULTAT DIAGNOSTIC:")
         print(json.dumps(diag, indent=2))
         success = diag["internet"] and diag["dns"]
+    fixer._flush_log()
 
     print("\n" + "=" * 50)
 
     result = {
         "success": success,
         "action": args.action,
-        "logs": fixer.results
+        "logs": [{"level": level, "message": message} for level, message in fixer.results]
     }
-    print(json.dumps(result))
+    json.dump(result, sys.stdout, ensure_ascii=False, separators=(",", ":"))
+    sys.stdout.write("\n")
 
     return 0 if success else 1
 
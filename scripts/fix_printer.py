@@ -17,7 +17,30 @@ import sys
 import json
 import time
 import os
+import shlex
 import argparse
+from typing import Union
+
+# pywin32 si disponible, sinon appel direct à winspool via ctypes
+try:
+    import win32print
+    import win32serviceutil
+    HAS_PYWIN32 = True
+except ImportError:
+    HAS_PYWIN32 = False
+
+PRINTER_ENUM_LOCAL = 0x00000002
+PRINTER_ENUM_CONNECTIONS = 0x00000004
+PRINTER_ATTRIBUTE_DEFAULT = 0x00000004
+PRINTER_ATTRIBUTE_WORK_OFFLINE = 0x00000400
+PRINTER_STATUS_ERROR = 0x00000002
+PRINTER_STATUS_OFFLINE = 0x00000080
+SC_MANAGER_CONNECT = 0x0001
+SERVICE_QUERY_STATUS = 0x0004
+SERVICE_RUNNING = 4
+
+# Pas de console transitoire pour les commandes lancées (Windows uniquement)
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
 
 
 class PrinterFixer:
@@ -26,23 +49,35 @@ class PrinterFixer:
     def __init__(self, verbose=False):
         self.verbose = verbose
         self.results = []
+        self._log_buf = []
 
     def log(self, message: str, level: str = "info"):
         """Log avec niveau."""
         prefix = {"info": "ℹ️", "success": "✅", "warning": "⚠️", "error": "❌", "run": "🔄"}.get(level, "")
-        print(f"{prefix} {message}")
-        self.results.append({"level": level, "message": message})
-
-    def run_command(self, command: str, description: str, as_admin: bool = False) -> bool:
+        self._log_buf.append(f"{prefix} {message}")
+        # Tuple compact : les dicts ne sont construits qu'à la sortie JSON finale
+        self.results.append((level, message))
+
+    def _flush_log(self):
+        """Écrit les messages en attente en une seule écriture sur stdout."""
+        lines, self._log_buf = self._log_buf, []
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    def run_command(self, command: Union[str, list], description: str, as_admin: bool = False) -> bool:
         """Exécute une commande système."""
         self.log(f"{description}...", "run")
         try:
+            if isinstance(command, str):
+                command = shlex.split(command, posix=False)
             result = subprocess.run(
                 command,
-                shell=True,
+                shell=False,
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=30,
+                creationflags=CREATE_NO_WINDOW
             )
             if result.returncode == 0:
                 self.log(f"{description} - OK", "success")
@@ -92,13 +127,14 @@ class PrinterFixer:
         try:
             if os.path.exists(spool_folder):
                 files_deleted = 0
-                for filename in os.listdir(spool_folder):
-                    file_path = os.path.join(spool_folder, filename)
+                with os.scandir(spool_folder) as it:
+                    entries = list(it)
+                for entry in entries:
                     try:
-                        os.remove(file_path)
+                        os.remove(entry.path)
                         files_deleted += 1
                     except (PermissionError, OSError) as e:
-                        self.log(f"Impossible de supprimer {filename}: {e}", "warning")
+                        self.log(f"Impossible de supprimer {entry.name}: {e}", "warning")
 
                 self.log(f"Supprimé {files_deleted} fichier(s) de la file", "success")
             else:
@@ -111,26 +147,147 @@ class PrinterFixer:
 
         return start
 
+    def _spooler_running(self) -> bool:
+        """Interroge le gestionnaire de services pour l'état du Spooler."""
+        if HAS_PYWIN32:
+            return win32serviceutil.QueryServiceStatus("Spooler")[1] == SERVICE_RUNNING
+
+        import ctypes
+        from ctypes import wintypes
+
+        class SERVICE_STATUS(ctypes.Structure):
+            _fields_ = [
+                ("dwServiceType", wintypes.DWORD),
+                ("dwCurrentState", wintypes.DWORD),
+                ("dwControlsAccepted", wintypes.DWORD),
+                ("dwWin32ExitCode", wintypes.DWORD),
+                ("dwServiceSpecificExitCode", wintypes.DWORD),
+                ("dwCheckPoint", wintypes.DWORD),
+                ("dwWaitHint", wintypes.DWORD),
+            ]
+
+        advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+        advapi32.OpenSCManagerW.restype = wintypes.HANDLE
+        advapi32.OpenServiceW.restype = wintypes.HANDLE
+        advapi32.OpenServiceW.argtypes = [wintypes.HANDLE, wintypes.LPCWSTR, wintypes.DWORD]
+        advapi32.QueryServiceStatus.argtypes = [wintypes.HANDLE, ctypes.POINTER(SERVICE_STATUS)]
+        advapi32.CloseServiceHandle.argtypes = [wintypes.HANDLE]
+
+        manager = advapi32.OpenSCManagerW(None, None, SC_MANAGER_CONNECT)
+        if not manager:
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            service = advapi32.OpenServiceW(manager, "Spooler", SERVICE_QUERY_STATUS)
+            if not service:
+                raise ctypes.WinError(ctypes.get_last_error())
+            try:
+                status = SERVICE_STATUS()
+                if not advapi32.QueryServiceStatus(service, ctypes.byref(status)):
+                    raise ctypes.WinError(ctypes.get_last_error())
+                return status.dwCurrentState == SERVICE_RUNNING
+            finally:
+                advapi32.CloseServiceHandle(service)
+        finally:
+            advapi32.CloseServiceHandle(manager)
+
+    @staticmethod
+    def _printer_status(status: int, attributes: int) -> str:
+        """Traduit les bits Status/Attributes de PRINTER_INFO_2."""
+        if status & PRINTER_STATUS_OFFLINE or attributes & PRINTER_ATTRIBUTE_WORK_OFFLINE:
+            return "Offline"
+        if status & PRINTER_STATUS_ERROR:
+            return "Error"
+        return "OK"
+
+    def _enum_printers_ctypes(self) -> list:
+        """EnumPrintersW (niveau 2) via ctypes, sans pywin32."""
+        import ctypes
+        from ctypes import wintypes
+
+        class PRINTER_INFO_2(ctypes.Structure):
+            _fields_ = [
+                ("pServerName", wintypes.LPWSTR),
+                ("pPrinterName", wintypes.LPWSTR),
+                ("pShareName", wintypes.LPWSTR),
+                ("pPortName", wintypes.LPWSTR),
+                ("pDriverName", wintypes.LPWSTR),
+                ("pComment", wintypes.LPWSTR),
+                ("pLocation", wintypes.LPWSTR),
+                ("pDevMode", ctypes.c_void_p),
+                ("pSepFile", wintypes.LPWSTR),
+                ("pPrintProcessor", wintypes.LPWSTR),
+                ("pDatatype", wintypes.LPWSTR),
+                ("pParameters", wintypes.LPWSTR),
+                ("pSecurityDescriptor", ctypes.c_void_p),
+                ("Attributes", wintypes.DWORD),
+                ("Priority", wintypes.DWORD),
+                ("DefaultPriority", wintypes.DWORD),
+                ("StartTime", wintypes.DWORD),
+                ("UntilTime", wintypes.DWORD),
+                ("Status", wintypes.DWORD),
+                ("cJobs", wintypes.DWORD),
+                ("AveragePPM", wintypes.DWORD),
+            ]
+
+        winspool = ctypes.WinDLL("winspool.drv", use_last_error=True)
+        flags = PRINTER_ENUM_LOCAL | PRINTER_ENUM_CONNECTIONS
+        needed = wintypes.DWORD(0)
+        returned = wintypes.DWORD(0)
+
+        # Premier appel pour connaître la taille du buffer
+        winspool.EnumPrintersW(flags, None, 2, None, 0, ctypes.byref(needed), ctypes.byref(returned))
+        if needed.value == 0:
+            return []
+        buffer = ctypes.create_string_buffer(needed.value)
+        if not winspool.EnumPrintersW(flags, None, 2, buffer, needed, ctypes.byref(needed), ctypes.byref(returned)):
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        default_name = None
+        size = wintypes.DWORD(0)
+        winspool.GetDefaultPrinterW(None, ctypes.byref(size))
+        if size.value:
+            name_buffer = ctypes.create_unicode_buffer(size.value)
+            if winspool.GetDefaultPrinterW(name_buffer, ctypes.byref(size)):
+                default_name = name_buffer.value
+
+        infos = ctypes.cast(buffer, ctypes.POINTER(PRINTER_INFO_2))
+        return [
+            {
+                "pPrinterName": infos[i].pPrinterName,
+                "Status": infos[i].Status,
+                "Attributes": infos[i].Attributes,
+                "default": infos[i].pPrinterName == default_name,
+            }
+            for i in range(returned.value)
+        ]
+
     def list_printers(self) -> list:
         """Liste les imprimantes installées."""
         printers = []
+        if sys.platform != 'win32':
+            return printers
 
         try:
-            result = subprocess.run(
-                'wmic printer get name,status,default /Format:csv',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                parts = line.strip().split(',')
-                if len(parts) >= 4:
-                    printers.append({
-                        "name": parts[2] if len(parts) > 2 else "Unknown",
-                        "default": parts[1].upper() == "TRUE" if len(parts) > 1 else False,
-                        "status": parts[3] if len(parts) > 3 else "Unknown"
-                    })
+            if HAS_PYWIN32:
+                try:
+                    default_name = win32print.GetDefaultPrinter()
+                except Exception:
+                    default_name = None
+                entries = win32print.EnumPrinters(
+                    win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS, None, 2
+                )
+                for entry in entries:
+                    entry["default"] = entry["pPrinterName"] == default_name
+            else:
+                entries = self._enum_printers_ctypes()
+
+            for entry in entries:
+                attributes = entry["Attributes"]
+                printers.append({
+                    "name": entry["pPrinterName"] or "Unknown",
+                    "default": entry["default"] or bool(attributes & PRINTER_ATTRIBUTE_DEFAULT),
+                    "status": self._printer_status(entry["Status"], attributes)
+                })
         except Exception as e:
             self.log(f"Erreur lors de la liste des imprimantes: {e}", "error")
 
@@ -150,20 +307,15 @@ class PrinterFixer:
         # Vérifier le service spooler
         self.log("Vérification du service Spooler...", "run")
         try:
-            result = subprocess.run(
-                'sc query spooler',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            if "RUNNING" in result.stdout.upper():
-                diagnosis["spooler_running"] = True
-                self.log("Service Spooler: EN COURS", "success")
-            else:
-                diagnosis["issues"].append("Service Spooler non actif")
-                self.log("Service Spooler: ARRÊTÉ", "error")
+            running = self._spooler_running()
         except Exception:
-            pass
+            running = False
+        if running:
+            diagnosis["spooler_running"] = True
+            self.log("Service Spooler: EN COURS", "success")
+        else:
+            diagnosis["issues"].append("Service Spooler non actif")
+            self.log("Service Spooler: ARRÊTÉ", "error")
 
         # Lister les imprimantes
         printers = self.list_printers()
@@ -203,10 +355,12 @@ class PrinterFixer:
     def full_repair(self) -> bool:
         """Réparation complète des imprimantes."""
         self.log("🔧 RÉPARATION COMPLÈTE IMPRIMANTES", "info")
+        self._flush_log()
         print("=" * 50)
 
         # 1. Diagnostic
         diag = self.diagnose()
+        self._flush_log()
 
         if not diag["issues"]:
             self.log("Tout semble fonctionner correctement", "success")
@@ -214,9 +368,11 @@ class PrinterFixer:
 
         # 2. Vider la file
         self.clear_print_queue()
+        self._flush_log()
 
         # 3. Redémarrer le spooler
         self.restart_spooler()
+        self._flush_log()
 
         # 4. Vérifier à nouveau
         time.sleep(2)
@@ -252,18 +408,21 @@ def main():
         success = fixer.full_repair()
     else:  # diagnose
         diag = fixer.diagnose()
+        fixer._flush_log()
         print("\n📊 RÉSULTAT DIAGNOSTIC:")
         print(json.dumps(diag, indent=2, ensure_ascii=False))
         success = len(diag["issues"]) == 0
+    fixer._flush_log()
 
     print("\n" + "=" * 50)
 
     result = {
         "success": success,
         "action": args.action,
-        "logs": fixer.results
+        "logs": [{"level": level, "message": message} for level, message in fixer.results]
     }
-    print(json.dumps(result))
+    json.dump(result, sys.stdout, ensure_ascii=False, separators=(",", ":"))
+    sys.stdout.write("\n")
 
     return 0 if success else 1
 
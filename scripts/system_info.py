@@ -15,10 +15,18 @@ import os
 import sys
 import json
 import platform
+import re
+import shutil
+import signal
 import socket
 import argparse
+import asyncio
+import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import lru_cache
 
 # Essayer d'importer psutil, sinon utiliser les alternatives Windows
 try:
@@ -26,40 +34,364 @@ try:
     HAS_PSUTIL = True
 except ImportError:
     HAS_PSUTIL = False
-    import subprocess
-    import ctypes
+
+# orjson (optionnel) sérialise plus vite que le module json standard
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Durée minimale entre deux lectures CPU pour un delta significatif (secondes)
+CPU_MIN_SAMPLE = 0.1
+# Une lecture CPU plus récente que ce délai est réutilisée telle quelle
+CPU_CACHE_TTL = 0.5
+# Fenêtre minimale de la première lecture (mode ponctuel), depuis __init__
+CPU_FIRST_SAMPLE = 0.5
+
+# Systèmes de fichiers réels (tmpfs, overlay, squashfs... sont ignorés)
+_REAL_FSTYPES = {
+    "ext4", "ext3", "xfs", "btrfs", "zfs", "ntfs", "refs", "fat32", "vfat", "exfat", "apfs", "hfs"
+}
+# Partitions et adresses des interfaces sont relues au plus toutes les 60 s
+SNAPSHOT_REFRESH = 60
+
+# L'IP locale change rarement : relue au plus toutes les 10 minutes (mode --watch)
+LOCAL_IP_REFRESH = 600
+
+# Session PowerShell persistante arrêtée après ce délai d'inactivité (secondes)
+POWERSHELL_IDLE_TIMEOUT = 3.0
+# Durée maximale d'une requête avant d'abattre la session (WMI bloqué...),
+# comptée une fois la session démarrée
+POWERSHELL_QUERY_TIMEOUT = 5.0
+# Démarrage à froid de powershell.exe, hors budget des requêtes
+POWERSHELL_START_TIMEOUT = 15.0
+# Defender (10 s) + module NetSecurity du pare-feu (5 s)
+SECURITY_QUERY_TIMEOUT = 15.0
+POWERSHELL_SENTINEL = "__MICRODIAG_END__"
+
+# Toutes les métriques Windows (sans psutil) en une seule requête CIM
+POWERSHELL_SNAPSHOT = (
+    "$os = Get-CimInstance Win32_OperatingSystem -Property FreePhysicalMemory,TotalVisibleMemorySize,LastBootUpTime; "
+    "$cpu = Get-CimInstance Win32_Processor -Property LoadPercentage; "
+    "$disks = Get-CimInstance Win32_LogicalDisk -Filter 'DriveType=3' -Property DeviceID,FreeSpace,Size; "
+    "[pscustomobject]@{ "
+    "cpu = ($cpu | Measure-Object -Property LoadPercentage -Average).Average; "
+    "mem_total_kb = $os.TotalVisibleMemorySize; "
+    "mem_free_kb = $os.FreePhysicalMemory; "
+    "uptime_seconds = [int64]((Get-Date) - $os.LastBootUpTime).TotalSeconds; "
+    "disks = @($disks | ForEach-Object { @{ id = $_.DeviceID; free = $_.FreeSpace; size = $_.Size } }); "
+    "processes = (Get-Process).Count "
+    "} | ConvertTo-Json -Compress -Depth 4"
+)
+
+# Defender et pare-feu dans la même requête (le pare-feu reste lu sans Defender).
+# Sortie 'antivirus;temps réel;pare-feu' : True, False ou vide si inconnu
+POWERSHELL_SECURITY = (
+    "$s = Get-MpComputerStatus -ErrorAction SilentlyContinue; "
+    "$fw = @(Get-NetFirewallProfile -ErrorAction SilentlyContinue | ForEach-Object { $_.Enabled -eq 'True' }); "
+    "$fwOn = $null; if ($fw.Count) { $fwOn = $fw -contains $true }; "
+    "Write-Output \"$($s.AntivirusEnabled);$($s.RealTimeProtectionEnabled);$fwOn\""
+)
+_STATE = {"True": "active", "False": "inactive"}
+
+# L'état Defender / pare-feu change rarement : réutilisé pendant 5 minutes
+SECURITY_CACHE_TTL = 300
+
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+# Barres de progression et séparateur de l'affichage, construits une seule fois
+_BARS = tuple("█" * n + "░" * (10 - n) for n in range(11))
+_SEPARATOR = "=" * 50
+
+
+# Sondes invariantes pendant la vie du processus, partagées entre instances
+@lru_cache(maxsize=1)
+def _hostname() -> str:
+    return socket.gethostname()
+
+
+@lru_cache(maxsize=1)
+def _system() -> str:
+    return platform.system()
+
+
+@lru_cache(maxsize=1)
+def _version() -> str:
+    return platform.version()
+
+
+@lru_cache(maxsize=1)
+def _platform() -> str:
+    return platform.platform()
+
+
+def invalidate_platform_cache():
+    """Force une nouvelle lecture du nom d'hôte et de la plateforme."""
+    for probe in (_hostname, _system, _version, _platform):
+        probe.cache_clear()
+
+
+def _format_uptime(seconds: int) -> str:
+    """Durée au format 'Nd HH:MM:SS'."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{seconds // 86400}d {hours % 24:02}:{minutes:02}:{secs:02}"
+
+
+def _dumps(data) -> str:
+    """Sérialise en JSON compact (une ligne par échantillon)."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+_MEMINFO_RE = re.compile(rb"(\w+):\s+(\d+)")
+
+
+class _LinuxFastPath:
+    """Lecture directe de /proc sous Linux, sans l'intermédiaire de psutil."""
+
+    @staticmethod
+    def _proc_cpu_times() -> tuple:
+        """(temps inactif, temps total) en jiffies depuis la ligne 'cpu' de /proc/stat."""
+        with open("/proc/stat", "rb", buffering=0) as f:
+            line = f.read(512).split(b"\n", 1)[0]
+        # user nice system idle iowait irq softirq steal (guest est inclus dans user)
+        fields = [int(value) for value in line.split()[1:9]]
+        return fields[3] + fields[4], sum(fields)
+
+    @staticmethod
+    def _proc_memory_info() -> dict:
+        """Informations mémoire depuis /proc/meminfo."""
+        with open("/proc/meminfo", "rb", buffering=0) as f:
+            meminfo = {key: int(value) * 1024 for key, value in _MEMINFO_RE.findall(f.read())}
+        total = meminfo[b"MemTotal"]
+        free = meminfo.get(b"MemFree", 0)
+        buffers = meminfo.get(b"Buffers", 0)
+        cached = meminfo.get(b"Cached", 0)
+        used = total - free - buffers - cached - meminfo.get(b"Slab", 0)
+        available = meminfo.get(b"MemAvailable", free + buffers + cached)
+        return {
+            "total_gb": round(total / (1024**3), 2),
+            "available_gb": round(available / (1024**3), 2),
+            "used_gb": round(used / (1024**3), 2),
+            "percent": round((total - available) / total * 100, 1) if total > 0 else 0
+        }
 
 
-class SystemInfo:
+class SystemInfo(_LinuxFastPath):
     """Collecteur d'informations système."""
 
     def __init__(self):
-        self.hostname = socket.gethostname()
-        self.os_type = platform.system().lower()
-        self.os_version = platform.version()
+        self.hostname = _hostname()
+        self.os_type = _system().lower()
+        self.os_version = _version()
+        # Valeurs immuables, calculées une seule fois
+        self._platform = _platform()
+        self._cpu_count = os.cpu_count()
+
+        # Amorce le compteur CPU : les lectures suivantes sont non bloquantes
+        self._cpu_value = None
+        self._cpu_ts = time.monotonic()
+        self._use_proc = False
+        self._last_cpu = None
+        if self.os_type == "linux":
+            try:
+                self._last_cpu = self._proc_cpu_times()
+                self._use_proc = True
+            except (OSError, ValueError, IndexError):
+                pass
+        if HAS_PSUTIL and not self._use_proc:
+            self._last_cpu = self._psutil_cpu_times()
+
+        self._partitions = None
+        self._partitions_ts = 0.0
+        self._net_addrs_snapshot = None
+
+        # L'heure de démarrage ne change pas pendant la vie du processus
+        self._boot_time = psutil.boot_time() if HAS_PSUTIL else None
+        self._boot_iso = datetime.fromtimestamp(self._boot_time).isoformat() if HAS_PSUTIL else None
+
+        self._local_ip = self._resolve_local_ip()
+        self._local_ip_ts = time.monotonic()
+
+        # Session PowerShell partagée par les collecteurs Windows
+        self._ps = None
+        self._ps_lock = threading.Lock()
+        self._ps_idle_timer = None
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._sec_cache = None
+        self._sec_ts = 0.0
+
+        # Pilotage de la boucle de surveillance (réveillée par les signaux)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def stop(self):
+        """Interrompt la boucle de surveillance."""
+        self._stop.set()
+        self._wake.set()
+
+    def request_sample(self):
+        """Déclenche immédiatement un nouvel échantillon."""
+        self._wake.set()
+
+    def _wait_next(self, timeout: float) -> bool:
+        """Attend le prochain échantillon ; True si la surveillance doit s'arrêter."""
+        self._wake.wait(timeout)
+        self._wake.clear()
+        return self._stop.is_set()
+
+    def _powershell_exchange(self, script: str, timeout: float) -> str:
+        """Envoie une ligne de script et lit sa sortie jusqu'à la sentinelle."""
+        # Une session bloquée est abattue : la lecture se termine alors sur EOF
+        watchdog = threading.Timer(timeout, self._ps.kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            self._ps.stdin.write(f"{script}\nWrite-Output '{POWERSHELL_SENTINEL}'\n")
+            self._ps.stdin.flush()
+            lines = []
+            for line in self._ps.stdout:
+                if line.strip() == POWERSHELL_SENTINEL:
+                    return "".join(lines)
+                lines.append(line)
+        finally:
+            watchdog.cancel()
+        self._ps.wait()
+        self._ps = None
+        raise TimeoutError("Session PowerShell interrompue")
+
+    def _powershell_query(self, script: str, timeout: float = POWERSHELL_QUERY_TIMEOUT) -> str:
+        """Exécute une ligne de script dans la session PowerShell persistante."""
+        with self._ps_lock:
+            if self._ps_idle_timer is not None:
+                self._ps_idle_timer.cancel()
+            try:
+                if self._ps is None or self._ps.poll() is not None:
+                    self._ps = subprocess.Popen(
+                        ["powershell", "-NoProfile", "-NoLogo", "-NonInteractive", "-Command", "-"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                        errors="replace",
+                        creationflags=CREATE_NO_WINDOW
+                    )
+                    # Attend que la session réponde : le démarrage ne compte pas dans la requête
+                    self._powershell_exchange("", POWERSHELL_START_TIMEOUT)
+                return self._powershell_exchange(script, timeout)
+            finally:
+                self._ps_idle_timer = threading.Timer(POWERSHELL_IDLE_TIMEOUT, self._close_powershell)
+                self._ps_idle_timer.daemon = True
+                self._ps_idle_timer.start()
+
+    def _close_powershell(self):
+        """Arrête la session PowerShell inactive."""
+        with self._ps_lock:
+            if self._ps is not None:
+                try:
+                    self._ps.stdin.close()
+                    self._ps.wait(timeout=1)
+                except Exception:
+                    self._ps.kill()
+                self._ps = None
+
+    def _windows_snapshot(self) -> dict:
+        """Métriques Windows sans psutil, une seule requête par collect_all."""
+        if self.os_type != "windows":
+            return {}
+        with self._snapshot_lock:
+            if self._snapshot is None:
+                try:
+                    output = self._powershell_query(POWERSHELL_SNAPSHOT).strip()
+                    self._snapshot = json.loads(output.splitlines()[-1])
+                except Exception:
+                    self._snapshot = {}
+            return self._snapshot
+
+    def _resolve_local_ip(self) -> str:
+        """Détermine l'IP locale sans contacter d'hôte externe si possible."""
+        try:
+            for *_, sockaddr in socket.getaddrinfo(self.hostname, None, socket.AF_INET):
+                if not sockaddr[0].startswith("127."):
+                    return sockaddr[0]
+        except OSError:
+            pass
+
+        if HAS_PSUTIL:
+            for addrs in self._net_if_addrs().values():
+                for addr in addrs:
+                    if (addr.family == socket.AF_INET
+                            and not addr.address.startswith(("127.", "169.254."))):
+                        return addr.address
+
+        # Dernier recours : le hostname ne résout que vers le loopback
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                return s.getsockname()[0]
+        except OSError:
+            return "Unknown"
+
+    def _net_if_addrs(self) -> dict:
+        """Adresses des interfaces (psutil), mises en cache SNAPSHOT_REFRESH secondes."""
+        now = time.monotonic()
+        if self._net_addrs_snapshot is None or now - self._net_addrs_snapshot[0] > SNAPSHOT_REFRESH:
+            self._net_addrs_snapshot = (now, psutil.net_if_addrs())
+        return self._net_addrs_snapshot[1]
+
+    @staticmethod
+    def _psutil_cpu_times() -> tuple:
+        """(temps inactif, temps total) en secondes depuis psutil.cpu_times()."""
+        times = psutil.cpu_times()
+        # guest est déjà compté dans user (Linux)
+        guest = getattr(times, "guest", 0) + getattr(times, "guest_nice", 0)
+        return times.idle + getattr(times, "iowait", 0), sum(times) - guest
+
+    def _cpu_percent(self) -> float:
+        """Usage CPU depuis la lecture précédente des compteurs cumulés."""
+        idle, total = self._proc_cpu_times() if self._use_proc else self._psutil_cpu_times()
+        last_idle, last_total = self._last_cpu
+        self._last_cpu = (idle, total)
+        delta_total = total - last_total
+        if delta_total <= 0:
+            return self._cpu_value or 0.0
+        # iowait (compté comme inactif) peut reculer : borné comme le fait psutil
+        busy = (delta_total - (idle - last_idle)) / delta_total * 100
+        return round(min(100.0, max(0.0, busy)), 1)
 
     def get_cpu_usage(self) -> float:
         """Usage CPU en pourcentage."""
-        if HAS_PSUTIL:
-            return psutil.cpu_percent(interval=1)
+        if self._use_proc or HAS_PSUTIL:
+            elapsed = time.monotonic() - self._cpu_ts
+            if self._cpu_value is not None and elapsed < CPU_CACHE_TTL:
+                return self._cpu_value
+            window = CPU_MIN_SAMPLE if self._cpu_value is not None else CPU_FIRST_SAMPLE
+            if elapsed < window:
+                time.sleep(window - elapsed)
+            # Delta depuis la lecture précédente, sans attendre une seconde
+            self._cpu_value = self._cpu_percent()
+            self._cpu_ts = time.monotonic()
+            return self._cpu_value
 
         # Alternative Windows sans psutil
         try:
-            result = subprocess.run(
-                'wmic cpu get loadpercentage',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            lines = result.stdout.strip().split('\n')
-            if len(lines) >= 2:
-                return float(lines[1].strip())
-        except Exception:
-            pass
-        return 0.0
+            return float(self._windows_snapshot().get("cpu") or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
 
     def get_memory_info(self) -> dict:
         """Informations mémoire."""
+        if self._use_proc:
+            try:
+                return self._proc_memory_info()
+            except (OSError, KeyError, ValueError):
+                pass
+
         if HAS_PSUTIL:
             mem = psutil.virtual_memory()
             return {
@@ -71,21 +403,9 @@ class SystemInfo:
 
         # Alternative Windows
         try:
-            result = subprocess.run(
-                'wmic OS get FreePhysicalMemory,TotalVisibleMemorySize /Value',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            lines = result.stdout.strip().split('\n')
-            values = {}
-            for line in lines:
-                if '=' in line:
-                    key, val = line.strip().split('=')
-                    values[key] = int(val) if val.isdigit() else 0
-
-            total = values.get('TotalVisibleMemorySize', 0) * 1024  # KB to bytes
-            free = values.get('FreePhysicalMemory', 0) * 1024
+            snapshot = self._windows_snapshot()
+            total = int(snapshot.get("mem_total_kb") or 0) * 1024  # KB to bytes
+            free = int(snapshot.get("mem_free_kb") or 0) * 1024
             used = total - free
             percent = (used / total * 100) if total > 0 else 0
 
@@ -98,57 +418,90 @@ class SystemInfo:
         except Exception:
             return {"total_gb": 0, "available_gb": 0, "used_gb": 0, "percent": 0}
 
+    def _list_partitions(self) -> list:
+        """Partitions réelles (device, point de montage, type), mises en cache."""
+        now = time.monotonic()
+        if self._partitions is None or now - self._partitions_ts > SNAPSHOT_REFRESH:
+            if HAS_PSUTIL:
+                self._partitions = [
+                    (p.device, p.mountpoint, p.fstype) for p in psutil.disk_partitions(all=False)
+                    if p.fstype.lower() in _REAL_FSTYPES or p.device.startswith("/dev/")
+                ]
+            else:
+                # Linux sans psutil : lecture directe de la table des montages, filtrée
+                # sur le seul type (/dev/loop* squashfs, /dev/sr0 iso9660 sont toujours pleins)
+                self._partitions = []
+                with open("/proc/mounts", "rb") as f:
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) < 3 or fields[2].decode().lower() not in _REAL_FSTYPES:
+                            continue
+                        # Les espaces des points de montage sont encodés en \040
+                        mountpoint = fields[1].decode("unicode_escape").encode("latin-1").decode("utf-8", "replace")
+                        self._partitions.append((fields[0].decode(), mountpoint, fields[2].decode()))
+            self._partitions_ts = now
+        return self._partitions
+
+    @staticmethod
+    def _disk_usage(mountpoint: str) -> tuple:
+        """(total, utilisé, libre, pourcentage) d'un point de montage, None si inaccessible."""
+        try:
+            if HAS_PSUTIL:
+                usage = psutil.disk_usage(mountpoint)
+                return usage.total, usage.used, usage.free, usage.percent
+            usage = shutil.disk_usage(mountpoint)
+            available = usage.used + usage.free
+            percent = round(usage.used / available * 100, 1) if available > 0 else 0
+            return usage.total, usage.used, usage.free, percent
+        except (PermissionError, OSError):
+            return None
+
     def get_disk_info(self) -> list:
         """Informations disques."""
         disks = []
 
-        if HAS_PSUTIL:
-            for partition in psutil.disk_partitions():
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
+        if HAS_PSUTIL or self.os_type == "linux":
+            try:
+                partitions = self._list_partitions()
+            except OSError:
+                return disks
+
+            # statvfs / GetDiskFreeSpaceEx libèrent le GIL : appels en parallèle
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(partitions)))) as executor:
+                usages = executor.map(self._disk_usage, [mountpoint for _, mountpoint, _ in partitions])
+                for (device, mountpoint, fstype), usage in zip(partitions, usages):
+                    if usage is None:
+                        continue
+                    total, used, free, percent = usage
                     disks.append({
-                        "device": partition.device,
-                        "mountpoint": partition.mountpoint,
-                        "fstype": partition.fstype,
-                        "total_gb": round(usage.total / (1024**3), 2),
-                        "used_gb": round(usage.used / (1024**3), 2),
-                        "free_gb": round(usage.free / (1024**3), 2),
-                        "percent": usage.percent
+                        "device": device,
+                        "mountpoint": mountpoint,
+                        "fstype": fstype,
+                        "total_gb": round(total / (1024**3), 2),
+                        "used_gb": round(used / (1024**3), 2),
+                        "free_gb": round(free / (1024**3), 2),
+                        "percent": percent
                     })
-                except (PermissionError, OSError):
-                    pass
             return disks
 
         # Alternative Windows
-        try:
-            result = subprocess.run(
-                'wmic logicaldisk get caption,freespace,size /Format:csv',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                parts = line.strip().split(',')
-                if len(parts) >= 4 and parts[2] and parts[3]:
-                    try:
-                        free = int(parts[2])
-                        total = int(parts[3])
-                        used = total - free
-                        percent = (used / total * 100) if total > 0 else 0
-                        disks.append({
-                            "device": parts[1],
-                            "mountpoint": parts[1],
-                            "fstype": "NTFS",
-                            "total_gb": round(total / (1024**3), 2),
-                            "used_gb": round(used / (1024**3), 2),
-                            "free_gb": round(free / (1024**3), 2),
-                            "percent": round(percent, 1)
-                        })
-                    except (ValueError, IndexError):
-                        pass
-        except Exception:
-            pass
+        for disk in self._windows_snapshot().get("disks") or []:
+            try:
+                free = int(disk["free"])
+                total = int(disk["size"])
+                used = total - free
+                percent = (used / total * 100) if total > 0 else 0
+                disks.append({
+                    "device": disk["id"],
+                    "mountpoint": disk["id"],
+                    "fstype": "NTFS",
+                    "total_gb": round(total / (1024**3), 2),
+                    "used_gb": round(used / (1024**3), 2),
+                    "free_gb": round(free / (1024**3), 2),
+                    "percent": round(percent, 1)
+                })
+            except (KeyError, TypeError, ValueError):
+                pass
 
         return disks
 
@@ -159,17 +512,14 @@ class SystemInfo:
             "ip_addresses": []
         }
 
-        try:
-            # IP locale
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            info["local_ip"] = s.getsockname()[0]
-            s.close()
-        except Exception:
-            info["local_ip"] = "Unknown"
+        # IP locale mise en cache
+        if time.monotonic() - self._local_ip_ts > LOCAL_IP_REFRESH:
+            self._local_ip = self._resolve_local_ip()
+            self._local_ip_ts = time.monotonic()
+        info["local_ip"] = self._local_ip
 
         if HAS_PSUTIL:
-            for interface, addrs in psutil.net_if_addrs().items():
+            for interface, addrs in self._net_if_addrs().items():
                 for addr in addrs:
                     if addr.family == socket.AF_INET:
                         info["ip_addresses"].append({
@@ -190,35 +540,21 @@ class SystemInfo:
         if self.os_type != "windows":
             return status
 
-        try:
-            # Windows Security Center
-            result = subprocess.run(
-                'powershell -Command "Get-MpComputerStatus | Select-Object AntivirusEnabled,RealTimeProtectionEnabled,FirewallEnabled | ConvertTo-Json"',
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                status["antivirus"] = "active" if data.get("AntivirusEnabled") else "inactive"
-                status["realtime_protection"] = "active" if data.get("RealTimeProtectionEnabled") else "inactive"
-        except Exception:
-            pass
+        if self._sec_cache is not None and time.monotonic() - self._sec_ts < SECURITY_CACHE_TTL:
+            return dict(self._sec_cache)
 
         try:
-            # Firewall
-            result = subprocess.run(
-                'netsh advfirewall show allprofiles state',
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if "ON" in result.stdout.upper():
-                status["firewall"] = "active"
-            else:
-                status["firewall"] = "inactive"
+            # Windows Security Center et pare-feu, via la session PowerShell partagée
+            output = self._powershell_query(POWERSHELL_SECURITY, SECURITY_QUERY_TIMEOUT).strip()
+            antivirus, realtime, firewall = output.splitlines()[-1].split(";")
+            if antivirus in _STATE:
+                status["antivirus"] = _STATE[antivirus]
+                status["realtime_protection"] = _STATE.get(realtime, "inactive")
+            if firewall in _STATE:
+                status["firewall"] = _STATE[firewall]
+            # Seule une requête aboutie est mise en cache
+            self._sec_cache = dict(status)
+            self._sec_ts = time.monotonic()
         except Exception:
             pass
 
@@ -227,72 +563,91 @@ class SystemInfo:
     def get_uptime(self) -> dict:
         """Temps de fonctionnement."""
         if HAS_PSUTIL:
-            boot_time = datetime.fromtimestamp(psutil.boot_time())
-            uptime = datetime.now() - boot_time
+            up = int(time.time() - self._boot_time)
             return {
-                "boot_time": boot_time.isoformat(),
-                "uptime_seconds": int(uptime.total_seconds()),
-                "uptime_readable": str(uptime).split('.')[0]
+                "boot_time": self._boot_iso,
+                "uptime_seconds": up,
+                "uptime_readable": _format_uptime(up)
             }
 
         # Alternative Windows
         try:
-            result = subprocess.run(
-                'net stats srv',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            # Parser la sortie pour trouver "Statistics since"
-            for line in result.stdout.split('\n'):
-                if 'since' in line.lower() or 'depuis' in line.lower():
-                    return {"uptime_readable": line.strip()}
-        except Exception:
+            up = int(self._windows_snapshot()["uptime_seconds"])
+            if self._boot_iso is None:
+                self._boot_iso = datetime.fromtimestamp(time.time() - up).isoformat()
+            return {
+                "boot_time": self._boot_iso,
+                "uptime_seconds": up,
+                "uptime_readable": _format_uptime(up)
+            }
+        except (KeyError, TypeError, ValueError):
             pass
 
         return {"uptime_readable": "Unknown"}
 
     def get_processes_count(self) -> int:
         """Nombre de processus."""
+        if self._use_proc:
+            # Un répertoire numérique par PID, sans construire la liste
+            try:
+                with os.scandir("/proc") as entries:
+                    return sum(1 for entry in entries if entry.name.isdigit())
+            except OSError:
+                pass
+
         if HAS_PSUTIL:
             return len(psutil.pids())
 
         try:
-            result = subprocess.run(
-                'tasklist /NH',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            return len([l for l in result.stdout.split('\n') if l.strip()])
-        except Exception:
+            return int(self._windows_snapshot().get("processes") or 0)
+        except (TypeError, ValueError):
             return 0
 
-    def collect_all(self) -> dict:
-        """Collecte toutes les informations."""
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "hostname": self.hostname,
-            "os": {
-                "type": self.os_type,
-                "version": self.os_version,
-                "platform": platform.platform()
-            },
-            "cpu": {
-                "usage_percent": self.get_cpu_usage(),
-                "cores": os.cpu_count()
-            },
-            "memory": self.get_memory_info(),
-            "disks": self.get_disk_info(),
-            "network": self.get_network_info(),
-            "security": self.get_security_status(),
-            "uptime": self.get_uptime(),
-            "processes_count": self.get_processes_count()
-        }
+    def collect_all(self, security: dict = None) -> dict:
+        """Collecte toutes les informations (security : statut déjà obtenu, optionnel)."""
+        self._snapshot = None
+        # Collecteurs indépendants et bloquants (sous-processus, sockets) :
+        # exécutés en parallèle, la durée totale est celle du plus lent
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            memory = executor.submit(self.get_memory_info)
+            disks = executor.submit(self.get_disk_info)
+            network = executor.submit(self.get_network_info)
+            security_future = executor.submit(self.get_security_status) if security is None else None
+            uptime = executor.submit(self.get_uptime)
+            processes = executor.submit(self.get_processes_count)
+            futures = [memory, disks, network, uptime, processes]
+            if security_future:
+                futures.append(security_future)
+            wait(futures)
+
+            # Lecture CPU en dernier : la durée des autres collecteurs s'ajoute
+            # à la fenêtre d'échantillonnage au lieu de s'y superposer
+            cpu_usage = self.get_cpu_usage()
 
-    def get_health_score(self) -> dict:
-        """Calcule un score de santé global."""
-        data = self.collect_all()
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "hostname": self.hostname,
+                "os": {
+                    "type": self.os_type,
+                    "version": self.os_version,
+                    "platform": self._platform
+                },
+                "cpu": {
+                    "usage_percent": cpu_usage,
+                    "cores": self._cpu_count
+                },
+                "memory": memory.result(),
+                "disks": disks.result(),
+                "network": network.result(),
+                "security": security_future.result() if security_future else security,
+                "uptime": uptime.result(),
+                "processes_count": processes.result()
+            }
+
+    def get_health_score(self, data: dict = None) -> dict:
+        """Calcule un score de santé global (à partir de data si déjà collecté)."""
+        if data is None:
+            data = self.collect_all()
         score = 100
         issues = []
 
@@ -329,6 +684,34 @@ class SystemInfo:
         }
 
 
+async def watch(info: SystemInfo, interval: int, as_json: bool):
+    """Boucle de surveillance à cadence fixe."""
+    loop = asyncio.get_running_loop()
+    # Le statut Defender (requête lente) est obtenu en tâche de fond pendant
+    # le cycle précédent, puis simplement attendu par le cycle suivant
+    security_task = loop.run_in_executor(None, info.get_security_status)
+
+    while True:
+        started = loop.time()
+        security = await security_task
+        security_task = loop.run_in_executor(None, info.get_security_status)
+
+        data = await loop.run_in_executor(None, info.collect_all, security)
+        health = info.get_health_score(data)
+        data["health"] = health
+
+        if as_json:
+            print(_dumps(data), flush=True)
+        else:
+            print(f"[{data['timestamp']}] CPU: {data['cpu']['usage_percent']}% | "
+                  f"RAM: {data['memory']['percent']}% | "
+                  f"Score: {health['score']}/100 ({health['status']})")
+
+        # Attente interruptible : Ctrl+C arrête, SIGUSR1 force un échantillon
+        if await loop.run_in_executor(None, info._wait_next, max(0, interval - (loop.time() - started))):
+            break
+
+
 def main():
     parser = argparse.ArgumentParser(description="Microdiag - Infos système")
     parser.add_argument("--json", action="store_true", help="Sortie JSON uniquement")
@@ -340,35 +723,27 @@ def main():
 
     if args.watch:
         print("Mode surveillance activé. Ctrl+C pour arrêter.\n")
+        signal.signal(signal.SIGINT, lambda *_: info.stop())
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: info.request_sample())
         try:
-            while True:
-                data = info.collect_all()
-                health = info.get_health_score()
-                data["health"] = health
-
-                if args.json:
-                    print(json.dumps(data))
-                else:
-                    print(f"[{data['timestamp']}] CPU: {data['cpu']['usage_percent']}% | "
-                          f"RAM: {data['memory']['percent']}% | "
-                          f"Score: {health['score']}/100 ({health['status']})")
-
-                time.sleep(args.interval)
+            asyncio.run(watch(info, args.interval, args.json))
         except KeyboardInterrupt:
-            print("\nArrêt de la surveillance.")
-            return 0
+            pass
+        print("\nArrêt de la surveillance.")
+        return 0
 
     # Mode normal
     data = info.collect_all()
-    health = info.get_health_score()
+    health = info.get_health_score(data)
     data["health"] = health
 
     if args.json:
-        print(json.dumps(data, indent=2))
+        print(_dumps(data))
     else:
-        print("=" * 50)
+        print(_SEPARATOR)
         print("🖥️  MICRODIAG SENTINEL - INFORMATIONS SYSTÈME")
-        print("=" * 50)
+        print(_SEPARATOR)
         print(f"\n📌 Hôte: {data['hostname']}")
         print(f"🖥️  OS: {data['os']['platform']}")
         print(f"⏱️  Uptime: {data['uptime'].get('uptime_readable', 'N/A')}")
@@ -377,7 +752,7 @@ def main():
 
         print("\n💾 Disques:")
         for disk in data['disks']:
-            bar = "█" * int(disk['percent'] / 10) + "░" * (10 - int(disk['percent'] / 10))
+            bar = _BARS[min(10, max(0, int(disk['percent'] / 10)))]
             print(f"   {disk['device']}: [{bar}] {disk['percent']}% ({disk['free_gb']} GB libres)")
 
         print(f"\n🔒 Sécurité:")
@@ -388,7 +763,7 @@ def main():
         if health['issues']:
             print(f"   ⚠️  Problèmes: {', '.join(health['issues'])}")
 
-        print("\n" + "=" * 50)
+        print("\n" + _SEPARATOR)
 
     return 0
 